@@ -45,13 +45,12 @@ def main(args):
     program = Program()
     program.parse_file(args.filename)
     program.translate_statements()
-    program.set_addresses()
     program.fix_opcodes()
 
     if args.symbols:
         print("-- Symbol Table --")
         for symbol, value in program.get_symbol_table().items():
-            print("0x{} {}".format(value[2:].rjust(4, '0').upper(), symbol))
+            print("0x{:04X} {}".format(value, symbol))
 
     if args.print:
         print("-- Assembled Statements --")
@@ -28,53 +28,49 @@ class Program(object):
     def parse_file(self, filename):
         """
         Parses all of the lines in a file, and transforms each one into
-        a Statement.
+        a Statement. Blank lines are skipped without creating a Statement.
 
         :param filename: the name of the file to parse
         """
         with open(filename) as infile:
-            for line in infile:
-                statement = Statement()
-                statement.parse_line(line)
-                if not statement.is_empty():
-                    self.statements.append(statement)
+            lines = infile.read().split("\n")
+
+        for line in lines:
+            if not line or line.isspace():
+                continue
+            statement = Statement()
+            statement.parse_line(line)
+            self.statements.append(statement)
 
     def translate_statements(self):
         """
         Translates all the parsed statements into their respective
-        opcodes.
+        opcodes. At the same time, determines the address of each statement
+        and the address that each label refers to.
         """
-        for index, statement in enumerate(self.statements):
+        for statement in self.statements:
             try:
                 statement.translate()
             except TranslationError as error:
                 self.throw_error(error, statement)
-            label = statement.get_label()
-            if label:
-                if label in self.symbol_table:
-                    error = TranslationError("label [" + label + "] redefined")
-                    self.throw_error(error, statement)
-                self.symbol_table[label] = index
-
-    def set_addresses(self):
-        """
-        Determines the address that each label refers to.
-        """
-        for statement in self.statements:
-            label = statement.get_label()
-            if label:
-                self.symbol_table[label] = hex(self.address)
-            statement.set_address(hex(self.address))
-            if not statement.comment_only and not statement.is_empty():
-                self.address += 1 if statement.operation == FCB else 2
+            # Every labelled statement takes up at least one byte, so a label
+            # already recorded at a different address was defined earlier
+            label = statement.label
+            if label and self.symbol_table.setdefault(label, self.address) != self.address:
+                error = TranslationError("label [" + label + "] redefined")
+                self.throw_error(error, statement)
+            statement.set_address(self.address)
+            if not statement.comment_only:
+                self.address += 1 if statement.mnemonic == FCB else 2
 
     def fix_opcodes(self):
         """
-        Calculates the final opcode for each statement in the program.
+        Calculates the final opcode for each statement in the program, after
+        replacing any label the statement refers to with its address.
         """
+        addresses = {label: "{:X}".format(value) for label, value in self.symbol_table.items()}
         for statement in self.statements:
-            for label, value in self.symbol_table.items():
-                statement.replace_label(label, value[2:])
+            statement.resolve_labels(addresses)
             try:
                 statement.fix_values()
             except TranslationError as error:
@@ -96,18 +92,24 @@ class Program(object):
         """
         return self.statements
 
+    def generate_binary(self):
+        """
+        Generates the binary image of the program from the actual statements.
+
+        :return: a bytes object containing the resulting machine code output
+        """
+        return bytes.fromhex("".join(
+            statement.op_code for statement in self.statements
+            if not statement.empty and not statement.comment_only
+        ))
+
     def generate_machine_code(self):
         """
         Generates the machine code from the actual statements.
 
         :return: a list of integers representing the resulting machine code output
         """
-        machine_codes = []
-        for statement in self.statements:
-            if not statement.is_empty() and not statement.comment_only:
-                for index in range(0, len(statement.op_code), 2):
-                    machine_codes.append(int(statement.op_code[index:index + 2], 16))
-        return machine_codes
+        return list(self.generate_binary())
 
     def save_binary_file(self, filename):
         """
@@ -116,9 +118,9 @@ class Program(object):
 
         :param filename: the name of the file to save statements
         """
-        machine_codes = self.generate_machine_code()
+        binary = self.generate_binary()
         with open(filename, "wb") as outfile:
-            outfile.write(bytearray(machine_codes))
+            outfile.write(binary)
 
     @staticmethod
     def throw_error(error, statement):
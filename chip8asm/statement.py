@@ -7,9 +7,10 @@ This file contains Exceptions for the Chip 8 Assembler.
 # I M P O R T S ###############################################################
 
 import re
+import sys
 
 from collections import namedtuple
-from copy import copy
+from functools import lru_cache
 
 from chip8asm.exceptions import TranslationError, ParseError
 
@@ -24,7 +25,7 @@ NUMERIC_REG = "n"
 
 Operation = namedtuple('Operation', ['mnemonic', 'op', 'operands', 'source', 'target', 'numeric'])
 
-OPERATIONS = [
+OPERATIONS = (
     Operation(op="0nnn", operands=1, source=0, target=0, numeric=3, mnemonic="SYS"),
     Operation(op="00E0", operands=0, source=0, target=0, numeric=0, mnemonic="CLR"),
     Operation(op="00EE", operands=0, source=0, target=0, numeric=0, mnemonic="RTS"),
@@ -76,26 +77,113 @@ OPERATIONS = [
     Operation(op="F002", operands=0, source=0, target=0, numeric=0, mnemonic="AUDIO"),
     Operation(op="Fn03", operands=1, source=0, target=0, numeric=1, mnemonic="PLANE"),
     Operation(op="Fs3A", operands=1, source=1, target=0, numeric=0, mnemonic="PITCH"),
-]
+)
+
+# Operations keyed by their mnemonic
+OPERATIONS_BY_MNEMONIC = {operation.mnemonic: operation for operation in OPERATIONS}
 
 # Pseudo operations
 FCB = "FCB"
 FDB = "FDB"
-PSEUDO_OPERATIONS = [FCB, FDB]
-
-# Pattern to recognize a blank line
-BLANK_LINE_REGEX = re.compile(r"^\s*$")
+PSEUDO_OPERATIONS = frozenset((FCB, FDB))
 
-# Pattern to parse a comment line
-COMMENT_LINE_REGEX = re.compile(r"^\s*#\s*(?P<comment>.*)$")
+# Characters that may make up a label
+LABEL_CHARACTERS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
+)
 
-# Pattern to parse a single line
-ASM_LINE_REGEX = re.compile(
-    r"^(?P<label>\w*)\s+(?P<mnemonic>\w*)\s+(?P<operands>[\w$,+-]*)\s*[#]*\s*(?P<comment>.*)$"
+# Characters that may make up the operands field of a line
+OPERAND_CHARACTERS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$,+-"
 )
 
-# Pattern to match a register
-REG_LINE_REGEX = re.compile("[rR][0-9a-fA-F]$")
+# Upper case hex digits
+HEX_DIGITS = frozenset("0123456789ABCDEF")
+
+# Every valid register name, mapped to its upper case register number
+REGISTERS = {
+    prefix + digit: digit.upper() for prefix in "rR" for digit in "0123456789abcdefABCDEF"
+}
+
+# F U N C T I O N S ###########################################################
+
+
+@lru_cache(maxsize=4096)
+def tokenize_line(line):
+    """
+    Splits a line of assembly language text into its fields. Results are
+    cached by line text, since programs often repeat identical lines such as
+    sprite data or register moves.
+
+    :param line: the line of assembly language text to split
+    :return: None for a blank line, otherwise a tuple of comment_only, label,
+        mnemonic, operands and comment
+    """
+    if not line or line.isspace():
+        return None
+
+    stripped = line.lstrip()
+    if stripped.startswith("#"):
+        return True, None, None, None, stripped[1:].strip()
+
+    if line[:1].isspace():
+        label, fields = None, line.split(None, 1)
+    else:
+        label, *fields = line.split(None, 2)
+        if not fields or not LABEL_CHARACTERS.issuperset(label):
+            raise ParseError("could not parse line [{}]".format(line))
+
+    rest = fields[1] if len(fields) > 1 else ""
+    operands = rest.split(None, 1)[0] if rest else ""
+    if not OPERAND_CHARACTERS.issuperset(operands):
+        for index, character in enumerate(operands):
+            if character not in OPERAND_CHARACTERS:
+                operands = operands[:index]
+                break
+
+    return (
+        False,
+        sys.intern(label) if label else None,
+        sys.intern(fields[0]),
+        operands or None,
+        rest[len(operands):].lstrip().lstrip("#").strip() or None
+    )
+
+
+def build_emitter(operation):
+    """
+    Builds a function specialized to the given operation that assembles its
+    op code in a single str.format call. The op template is converted once
+    into a format string, where {0} is the source register, {1} is the target
+    register, and {2} is the numeric value - for example, 8st4 becomes
+    8{0}{1}4. The returned function takes the source, target and numeric
+    values, checks that the numeric value fits the width of the operation,
+    and zero-pads it to that width.
+
+    :param operation: the Operation to build the emitter for
+    :return: a function that returns the op code for the operation
+    """
+    emit = re.sub(
+        NUMERIC_REG + "+", "{2}",
+        operation.op.replace(SOURCE_REG, "{0}").replace(TARGET_REG, "{1}")
+    ).format
+    width = operation.numeric
+    if not width:
+        return lambda source, target, numeric: emit(source, target)
+
+    def emit_numeric(source, target, numeric):
+        if len(numeric) > width:
+            raise TranslationError("expected numeric of length {}, but was length {} [{}]".format(
+                width, len(numeric), numeric)
+            )
+        return emit(source, target, numeric.zfill(width))
+
+    return emit_numeric
+
+
+# Functions that assemble each op code from its source register, target
+# register, and numeric value - see build_emitter
+OPCODE_EMITTERS = {operation.op: build_emitter(operation) for operation in OPERATIONS}
 
 # C L A S S E S ###############################################################
 
@@ -110,6 +198,11 @@ class Statement(object):
     The statement can be parsed and translated to its Chip8 machine code
     equivalent.
     """
+    __slots__ = (
+        "empty", "comment_only", "operation", "label", "operands", "comment",
+        "size", "address", "mnemonic", "op_code", "source", "target", "numeric"
+    )
+
     def __init__(self):
         self.empty = True
         self.comment_only = False
@@ -126,13 +219,13 @@ class Statement(object):
         self.numeric = None
 
     def __str__(self):
-        return "0x{} {} {} {} {}  # {}".format(
-            self.get_address()[2:].upper().rjust(4, '0'),
-            self.get_op_code().upper().rjust(4, '0'),
-            self.get_label().rjust(10, ' '),
-            self.get_mnemonic().rjust(5, ' '),
-            self.get_operands().rjust(15, ' '),
-            self.get_comment().ljust(40, ' ')
+        return "0x%04X %s %10s %5s %15s  # %-40s" % (
+            self.address or 0,
+            (self.op_code or "").upper().zfill(4),
+            self.label or "",
+            self.mnemonic or "",
+            self.operands or "",
+            self.comment or ""
         )
 
     @staticmethod
@@ -144,9 +237,10 @@ class Statement(object):
         :param string: a string representing the operand
         :return: True if the string is a register, False otherwise
         """
-        return REG_LINE_REGEX.match(string) is not None
+        return string in REGISTERS
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def get_value(string):
         """
         Return the hex representation of the value if it starts with a '$'.
@@ -155,7 +249,12 @@ class Statement(object):
         :param string: the string to scan
         :return: the hex representation of the value, or the label
         """
-        return hex(int(string[1:], 16))[2:].upper() if string.startswith("$") else string
+        if not string.startswith("$"):
+            return string
+        value = string[1:].upper()
+        if not value or not HEX_DIGITS.issuperset(value):
+            raise TranslationError("expected hex value after $, but got [{}]".format(string))
+        return value.lstrip("0") or "0"
 
     @staticmethod
     def get_register(string):
@@ -164,11 +263,10 @@ class Statement(object):
 
         :param string: the hex representation of the register number
         """
-        if not Statement.is_register(string):
+        register = REGISTERS.get(string)
+        if register is None:
             raise TranslationError("expected register in r0-rF, but got [{}]".format(string))
-        if len(string) > 2:
-            raise TranslationError("invalid register [{}]".format(string))
-        return hex(int(string[1:], 16))[-1].upper()
+        return register
 
     def is_pseudo_op(self):
         """
@@ -215,15 +313,16 @@ class Statement(object):
         """
         Returns the address for this statement.
 
-        :return: the address for this statement
+        :return: the integer address for this statement, or None if it has
+            not been set
         """
-        return self.address or ""
+        return self.address
 
     def set_address(self, address):
         """
-        Set the address of the current operation in hex.
+        Set the address of the current operation.
 
-        :param address: the address of the operation
+        :param address: the integer address of the operation
         """
         self.address = address
 
@@ -255,26 +354,12 @@ class Statement(object):
         """
         Parse a line of assembly language text.
         """
-        if BLANK_LINE_REGEX.search(line):
-            return
-
-        data = COMMENT_LINE_REGEX.match(line)
-        if data:
-            self.empty = False
-            self.comment_only = True
-            self.comment = data.group("comment").strip()
-            return
-
-        data = ASM_LINE_REGEX.match(line)
-        if data:
-            self.label = data.group("label") or None
-            self.mnemonic = data.group("mnemonic") or None
-            self.operands = data.group("operands") or None
-            self.comment = data.group("comment").strip() or None
-            self.empty = False
+        fields = tokenize_line(line)
+        if fields is None:
             return
 
-        raise ParseError("could not parse line [{}]".format(line))
+        self.comment_only, self.label, self.mnemonic, self.operands, self.comment = fields
+        self.empty = False
 
     def translate(self):
         """
@@ -292,52 +377,52 @@ class Statement(object):
                 )
             return
 
-        for operation in OPERATIONS:
-            if operation.mnemonic == self.mnemonic:
-                self.operation = copy(operation)
-                break
-
-        if not self.operation:
+        operation = OPERATIONS_BY_MNEMONIC.get(self.mnemonic)
+        if not operation:
             raise TranslationError("invalid mnemonic [{}]'".format(self.mnemonic))
+        self.operation = operation
+        _, _, expected_operands, source, target, numeric = operation
 
         operands = self.operands.split(",") if self.operands else []
         num_operands = len(operands)
-        if num_operands != self.operation.operands:
+        if num_operands != expected_operands:
             raise TranslationError(
                 "expected {} operand(s), but got {}".format(
-                    self.operation.operands, num_operands
+                    expected_operands, num_operands
                 )
             )
 
         operand_counter = 0
-        if self.operation.source != 0:
+        if source != 0:
             self.source = self.get_register(operands[operand_counter])
             operand_counter += 1
 
-        if self.operation.target != 0:
+        if target != 0:
             self.target = self.get_register(operands[operand_counter])
             operand_counter += 1
 
-        if self.operation.numeric != 0:
-            self.numeric = self.get_value(operands[operand_counter])
+        if numeric != 0:
+            # Kept as written until labels are resolved, so that a $ literal
+            # such as $A is never mistaken for a label named A
+            self.numeric = operands[operand_counter]
 
-    def replace_label(self, label, value):
+    def resolve_labels(self, addresses):
         """
-        Given a label and a value, replace the source, target, or numeric
-        values with the given value if they are a label.
+        Replaces the numeric operand with an address if it names a label. The
+        source and target values are always register numbers, so they are
+        never labels.
 
-        :param label: the label to replace
-        :param value: the value to replace the label with
+        :param addresses: a dictionary mapping labels to their hex addresses
         """
-        self.source = value if self.source == label else self.source
-        self.target = value if self.target == label else self.target
-        self.numeric = value if self.numeric == label else self.numeric
+        self.numeric = addresses.get(self.numeric, self.numeric)
 
     def fix_values(self):
         """
         Translate the source, target, and numeric values into the appropriate
-        parts of the op code. For pseudo operations, simply copy the value to
-        the op code.
+        parts of the op code. Any $ value in the numeric operand is converted
+        to hex here, after labels have been resolved. For pseudo operations,
+        simply copy the value to the op code, padded out to one byte for FCB
+        and two bytes for FDB.
         """
         if self.comment_only:
             return
@@ -349,30 +434,18 @@ class Statement(object):
                         self.operands
                     )
                 )
-            self.op_code = self.get_value(self.operands)
+            width = 2 if self.mnemonic == FCB else 4
+            value = self.get_value(self.operands)
+            if len(value) > width:
+                raise TranslationError("expected value of length {}, but was length {} [{}]".format(
+                    width, len(value), value)
+                )
+            self.op_code = value.zfill(width)
             return
 
-        self.op_code = self.operation.op
-        if self.operation.source == 1:
-            if len(self.source) > 1:
-                raise TranslationError(
-                    "expected source in 0-F, but got {}".format(self.source)
-                )
-            self.op_code = self.op_code.replace(SOURCE_REG, self.source)
-        if self.operation.target == 1:
-            if len(self.target) > 1:
-                raise TranslationError(
-                    "expected target in 0-F, but got {}".format(self.target)
-                )
-            self.op_code = self.op_code.replace(TARGET_REG, self.target)
-        if self.operation.numeric != 0:
-            if len(self.numeric) > self.operation.numeric:
-                raise TranslationError("expected numeric of length {}, but was length {} [{}]".format(
-                    self.operation.numeric, len(self.numeric), self.numeric)
-                )
-            numeric = self.numeric.zfill(self.operation.numeric)
-            numeric_string = NUMERIC_REG * self.operation.numeric
-            self.op_code = self.op_code.replace(numeric_string, numeric)
+        if self.numeric:
+            self.numeric = self.get_value(self.numeric)
+        self.op_code = OPCODE_EMITTERS[self.operation.op](self.source, self.target, self.numeric)
 
 
 # E N D   O F   F I L E #######################################################
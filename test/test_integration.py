@@ -30,7 +30,6 @@ class TestIntegration(unittest.TestCase):
         Given a program, translate the statements into machine code.
         """
         program.translate_statements()
-        program.set_addresses()
         program.fix_opcodes()
         return program
 
@@ -88,4 +87,60 @@ class TestIntegration(unittest.TestCase):
         machine_code = program.generate_machine_code()
         self.assertEqual([0x00, 0xD5], machine_code)
 
+    def test_label_references_resolve_to_addresses(self):
+        program = Program()
+        for line in ["start    JUMP    end", "         CALL    start", "end      JUMP    start"]:
+            statement = Statement()
+            statement.parse_line(line)
+            program.statements.append(statement)
+        program = self.translate_statements(program)
+        machine_code = program.generate_machine_code()
+        self.assertEqual([0x12, 0x04, 0x22, 0x00, 0x12, 0x00], machine_code)
+
+    def test_fcb_pads_value_to_one_byte(self):
+        program = Program()
+        statement = Statement()
+        statement.parse_line("data    FCB    $1")
+        program.statements.append(statement)
+        program = self.translate_statements(program)
+        machine_code = program.generate_machine_code()
+        self.assertEqual([0x01], machine_code)
+
+    def test_fdb_pads_value_to_two_bytes(self):
+        program = Program()
+        statement = Statement()
+        statement.parse_line("data    FDB    $F")
+        program.statements.append(statement)
+        program = self.translate_statements(program)
+        machine_code = program.generate_machine_code()
+        self.assertEqual([0x00, 0x0F], machine_code)
+
+    def test_fcb_advances_address_by_one_byte(self):
+        program = Program()
+        for line in ["one    FCB    $1", "two    FDB    $2", "three  FCB    $3"]:
+            statement = Statement()
+            statement.parse_line(line)
+            program.statements.append(statement)
+        program = self.translate_statements(program)
+        self.assertEqual(dict(one=0x200, two=0x201, three=0x203), program.get_symbol_table())
+
+    def test_register_not_replaced_by_matching_label(self):
+        program = Program()
+        for line in ["A      MOVE    rA,rB", "B      JUMP    A", "       LOAD    r2,$A"]:
+            statement = Statement()
+            statement.parse_line(line)
+            program.statements.append(statement)
+        program = self.translate_statements(program)
+        machine_code = program.generate_machine_code()
+        self.assertEqual([0x8A, 0xB0, 0x12, 0x00, 0x62, 0x0A], machine_code)
+
+    def test_generate_binary_returns_bytes(self):
+        program = Program()
+        for line in ["    CLR", "    FCB    $1A"]:
+            statement = Statement()
+            statement.parse_line(line)
+            program.statements.append(statement)
+        program = self.translate_statements(program)
+        self.assertEqual(b"\x00\xE0\x1A", program.generate_binary())
+
 # E N D   O F   F I L E #######################################################
@@ -6,6 +6,8 @@ A Chip 8 assembler - see the README.md file for details.
 """
 # I M P O R T S ###############################################################
 
+import os
+import tempfile
 import unittest
 
 from chip8asm.program import Program
@@ -38,5 +40,38 @@ class TestProgram(unittest.TestCase):
         program.statements.append(statement)
         self.assertEqual([statement], program.get_statements())
 
+    def test_parse_file_skips_blank_lines_and_keeps_comments(self):
+        program = Program()
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.asm")
+            with open(filename, "w") as outfile:
+                outfile.write("# A comment line\n\nstart    CLR\n    \n         JUMP    start\n")
+            program.parse_file(filename)
+
+        statements = program.get_statements()
+        self.assertEqual(3, len(statements))
+        self.assertTrue(statements[0].comment_only)
+        self.assertEqual("A comment line", statements[0].comment)
+        self.assertEqual("start", statements[1].label)
+        self.assertEqual("CLR", statements[1].mnemonic)
+        self.assertIsNone(statements[2].label)
+        self.assertEqual("JUMP", statements[2].mnemonic)
+        self.assertEqual("start", statements[2].operands)
+        self.assertFalse(any(statement.is_empty() for statement in statements))
+
+    def test_parse_file_splits_only_on_newlines(self):
+        program = Program()
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.asm")
+            with open(filename, "w") as outfile:
+                outfile.write("start    CLR    # page\x0cbreak\n         JUMP    start\n")
+            program.parse_file(filename)
+
+        statements = program.get_statements()
+        self.assertEqual(2, len(statements))
+        self.assertEqual("CLR", statements[0].mnemonic)
+        self.assertEqual("page\x0cbreak", statements[0].comment)
+        self.assertEqual("JUMP", statements[1].mnemonic)
+
 
 # E N D   O F   F I L E #######################################################